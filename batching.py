@@ -0,0 +1,77 @@
+class AdaptiveBatchSize:
+    """
+    A self-clocking controller for the number of objects fetched per batch.
+
+    The batch size doubles while the smoothed time per object keeps dropping
+    compared to the previous batch size, is halved as soon as it rises again and
+    stays put while it is about the same, always staying within the configured
+    bounds.
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        minimum: int,
+        maximum: int,
+        alpha: float = 0.5,
+        tolerance: float = 0.05,
+    ):
+        """
+        Args:
+            initial (int): The batch size to start with.
+            minimum (int): The smallest batch size the controller may choose.
+            maximum (int): The largest batch size the controller may choose.
+            alpha (float): Weight of the newest measurement in the moving average.
+            tolerance (float): Relative difference in time per object below which
+                two batch sizes count as equally fast.
+        """
+        self.minimum = max(1, min(minimum, maximum))
+        self.maximum = max(self.minimum, maximum)
+        self.size = min(max(initial, self.minimum), self.maximum)
+        self.alpha = alpha
+        self.tolerance = tolerance
+        # smoothed time per object at the current size, and the size before it
+        # together with the last time per object recorded at that size
+        self._per_object = None
+        self._previous = None
+
+    def record(self, elapsed: float, count: int):
+        """
+        Feeds the duration of a finished batch back into the controller.
+
+        Partial batches are ignored, since their fixed costs are spread over
+        fewer objects and would make the batch size look worse than it is.
+
+        Args:
+            elapsed (float): Wall-clock seconds spent on fetch, validation and update.
+            count (int): The number of objects in the batch.
+        """
+        if count == 0 or count < self.size:
+            return
+
+        current = elapsed / count
+        if self._per_object is not None:
+            current = self.alpha * current + (1 - self.alpha) * self._per_object
+        self._per_object = current
+
+        if self._previous is None:
+            self._resize(self.size * 2)
+            return
+
+        size, previous = self._previous
+        grew = size < self.size
+        if current < previous * (1 - self.tolerance):
+            # faster than the previous size: keep growing, or stay if the size
+            # was just halved
+            if grew:
+                self._resize(self.size * 2)
+        elif current > previous * (1 + self.tolerance):
+            # slower than the previous size: go back towards it
+            self._resize(self.size // 2 if grew else self.size * 2)
+
+    def _resize(self, size: int):
+        size = min(max(size, self.minimum), self.maximum)
+        if size != self.size:
+            self._previous = (self.size, self._per_object)
+            self.size = size
+            self._per_object = None
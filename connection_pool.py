@@ -0,0 +1,63 @@
+import queue
+from contextlib import contextmanager
+
+
+class ConnectionPool:
+    """
+    A fixed-size pool of database connections shared between threads.
+
+    Connections are checked out with the 'connection' context manager; when all
+    of them are in use, callers block until one is returned.
+    """
+
+    def __init__(self, connect, size: int, connections=()):
+        """
+        If opening a connection fails, the connections opened so far are closed
+        again before the error is raised.
+
+        Args:
+            connect (callable): Opens a new database connection.
+            size (int): The number of connections held by the pool.
+            connections (iterable): Already opened connections to adopt into the pool.
+        """
+        self._connections = queue.Queue()
+        self._size = 0
+        for connection in connections:
+            self._connections.put(connection)
+            self._size += 1
+        opened = []
+        try:
+            while self._size < size:
+                opened.append(connect())
+                self._connections.put(opened[-1])
+                self._size += 1
+        except Exception:
+            # the adopted connections stay with the caller, who still owns them
+            for connection in opened:
+                connection.close()
+            raise
+
+    @contextmanager
+    def connection(self):
+        """
+        Checks out a connection for the duration of the 'with' block.
+
+        Yields:
+            hdbcli.dbapi.Connection: A connection that is exclusive to the caller.
+        """
+        connection = self._connections.get()
+        try:
+            yield connection
+        finally:
+            self._connections.put(connection)
+
+    def close(self):
+        """
+        Closes all connections that are currently held by the pool.
+        """
+        while True:
+            try:
+                connection = self._connections.get_nowait()
+            except queue.Empty:
+                break
+            connection.close()
@@ -0,0 +1,65 @@
+import socket
+import threading
+import time
+
+_resolver = None
+_install_lock = threading.Lock()
+
+
+class CachedResolver:
+    """
+    A thread-safe TTL cache in front of socket.getaddrinfo.
+    """
+
+    def __init__(self, getaddrinfo, ttl: float = 300.0, maxsize: int = 1024):
+        """
+        Args:
+            getaddrinfo (callable): The resolver to cache, usually socket.getaddrinfo.
+            ttl (float): Seconds after which a cached lookup is resolved again.
+            maxsize (int): The maximum number of cached lookups.
+        """
+        self._getaddrinfo = getaddrinfo
+        self._ttl = ttl
+        self._maxsize = maxsize
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def getaddrinfo(self, *args, **kwargs):
+        """
+        Drop-in replacement for socket.getaddrinfo that serves repeated lookups from
+        the cache. Failed lookups are not cached.
+        """
+        key = (args, tuple(sorted(kwargs.items())))
+        now = time.monotonic()
+        with self._lock:
+            entry = self._cache.get(key)
+        if entry is not None and entry[0] > now:
+            return entry[1]
+
+        result = self._getaddrinfo(*args, **kwargs)
+        with self._lock:
+            if key not in self._cache and len(self._cache) >= self._maxsize:
+                # drop expired lookups first, then the oldest one
+                self._cache = {k: v for k, v in self._cache.items() if v[0] > now}
+                if len(self._cache) >= self._maxsize:
+                    del self._cache[next(iter(self._cache))]
+            self._cache[key] = (now + self._ttl, result)
+        return result
+
+
+def install(ttl: float = 300.0):
+    """
+    Routes all socket.getaddrinfo calls of the process through a CachedResolver.
+
+    urllib3 (and therefore requests) resolves every new connection through
+    socket.getaddrinfo, so many URLs on the same host only pay for one DNS lookup
+    per TTL. Calling this more than once has no further effect.
+
+    Args:
+        ttl (float): Seconds after which a cached lookup is resolved again.
+    """
+    global _resolver
+    with _install_lock:
+        if _resolver is None:
+            _resolver = CachedResolver(socket.getaddrinfo, ttl)
+            socket.getaddrinfo = _resolver.getaddrinfo
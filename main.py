@@ -1,25 +1,121 @@
 import configparser
+import functools
 import logging
+import queue
+import threading
+import time
 import traceback
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List
 import hdbcli.dbapi
+from batching import AdaptiveBatchSize
+from connection_pool import ConnectionPool
 from model import ValidationObject
 from validate_IBAN import validate_IBAN
 from validate_URL import validate_URL
 from validate_VAT_ID import validate_VAT_ID
 
+# Statements are kept constant and parameterized so HANA compiles each of
+# them once and serves every further batch from its plan cache.
+_SELECT_OBJECTS = """
+SELECT DISTINCT
+      CLASSIFICATION
+    , VALUE
+    , STATUS
+    , STATUS_MESSAGE
+    , LAST_VISITED
+    , ADDITIONAL_INFORMATION
+FROM
+	GENIUS.SHARED_NAIGENT_DATA
+WHERE
+	CLASSIFICATION = ?
+{condition}
+ORDER BY
+	LAST_VISITED ASC NULLS FIRST
+	, VALUE ASC
+LIMIT ?
+"""
+
+SELECT_QUERIES = {
+    "fast": _SELECT_OBJECTS.format(
+        condition="""AND (LAST_VISITED IS NULL
+	OR LAST_VISITED < ADD_DAYS(CURRENT_DATE, ?))"""
+    ),
+    "slow": _SELECT_OBJECTS.format(condition="AND STATUS = 'formal ok'"),
+}
+
+# update_objects sends one MERGE per MERGE_SIZE objects, with one parameterized
+# row per object in the USING clause; the casts give HANA the parameter types and
+# the first row names the columns for the whole UNION ALL
+_MERGE_COLUMNS = [
+    ("NVARCHAR(5000)", "STATUS"),
+    ("NVARCHAR(5000)", "STATUS_MESSAGE"),
+    ("TIMESTAMP", "LAST_VISITED"),
+    ("NVARCHAR(5000)", "ADDITIONAL_INFORMATION"),
+    ("NVARCHAR(5000)", "CLASSIFICATION"),
+    ("NVARCHAR(5000)", "VALUE"),
+]
+_MERGE_FIRST_ROW = "SELECT {} FROM DUMMY".format(
+    ", ".join(f"CAST(? AS {sql_type}) AS {name}" for sql_type, name in _MERGE_COLUMNS)
+)
+_MERGE_ROW = "SELECT {} FROM DUMMY".format(
+    ", ".join(f"CAST(? AS {sql_type})" for sql_type, _ in _MERGE_COLUMNS)
+)
+
+_MERGE_QUERY = """
+MERGE INTO GENIUS.SHARED_NAIGENT_DATA AS T
+USING (
+    {rows}
+) AS S
+ON T.CLASSIFICATION = S.CLASSIFICATION AND T.VALUE = S.VALUE
+WHEN MATCHED THEN UPDATE SET
+      T.STATUS = S.STATUS
+    , T.STATUS_MESSAGE = S.STATUS_MESSAGE
+    , T.LAST_VISITED = S.LAST_VISITED
+    , T.ADDITIONAL_INFORMATION = S.ADDITIONAL_INFORMATION
+"""
+
+MERGE_SIZE = 1024
+
+# MERGE statements only come in power-of-two sizes from this one up to
+# MERGE_SIZE, so HANA has a few statements to keep in its plan cache rather than
+# one per batch; unused rows are filled with NULLs, which match no object
+_MERGE_MIN_SIZE = 16
+
+# objects whose status did not change only get their visit recorded
+VISITED_QUERY = """
+    UPDATE GENIUS.SHARED_NAIGENT_DATA
+    SET LAST_VISITED = ?
+    WHERE CLASSIFICATION = ? AND VALUE = ?
+"""
+
+# original status of an object whose rows had different statuses in the database;
+# it never equals a validated status, so such objects are always merged
+_MIXED_STATUS = object()
+
+# number of rows read from the cursor per round-trip in get_objects
+FETCH_SIZE = 1000
+
 
 def main():
     """
     Main function to process classifications and validate objects.
 
-    Establishes a connection to the HANA database, retrieves classifications,
+    Opens a pool of connections to the HANA database, retrieves classifications,
     validates objects based on their classification, and updates the objects
     back into the database.
     """
+    connection = None
+    pool = None
     try:
         connection = get_connection()
         classifications = get_classifications(connection)
+        pool = ConnectionPool(
+            get_connection,
+            # only the fetch and the update stage of the pipeline hold one at once
+            2,
+            [connection],
+        )
         CLASS_MAPPING = {
             "URL": validate_URL,
             "IBAN": validate_IBAN,
@@ -31,59 +127,35 @@ def main():
         batching = config["batching"]
         history = batching.getint("history")
 
-        # run fast validations first (e.g. regex checks. etc.)
-        while True:
-            batchsize = batching.getint("batchsize_fast")
-            final = {classification: False for classification in classifications}
-            for classification in classifications:
-                objects = get_objects(
-                    connection, classification, batchsize, history, "fast"
+        validators = {}
+        for classification in classifications:
+            if classification in CLASS_MAPPING:
+                validators[classification] = CLASS_MAPPING[classification]()
+            else:
+                logging.warning(
+                    f"No validator found for classification: {classification}"
                 )
-                if len(objects) == 0:
-                    final[classification] = True
-                    continue
-                logging.info(f"Classification: {classification}")
-                if classification in CLASS_MAPPING:
-                    validator = CLASS_MAPPING[classification]()
-                    validated_objects = validator.validate_fast(objects)
-                    update_objects(connection, validated_objects)
-                    logging.info(
-                        f"Updated {len(validated_objects)} objects in database."
-                    )
-                else:
-                    logging.warning(
-                        f"No validator found for classification: {classification}"
-                    )
-            if all(final.values()):
-                break
+
+        # let HANA mark what it can decide on its own (e.g. regex checks)
+        run_server_side(pool, validators, history)
+
+        # run fast validations first (e.g. regex checks. etc.)
+        run_phase(
+            pool,
+            validators,
+            get_batchsizes(batching, "fast", validators),
+            history,
+            "fast",
+        )
 
         # run slow validations now (e.g. external api calls etc.)
-        while True:
-            batchsize = batching.getint("batchsize_slow")
-            final = {classification: False for classification in classifications}
-            for classification in classifications:
-                objects = get_objects(
-                    connection, classification, batchsize, history, "slow"
-                )
-                if len(objects) == 0:
-                    final[classification] = True
-                    continue
-                logging.info(f"Classification: {classification}")
-                if classification in CLASS_MAPPING:
-                    validator = CLASS_MAPPING[classification]()
-                    validated_objects = validator.validate_slow(objects)
-                    if validated_objects is None or len(validated_objects) == 0:
-                        continue
-                    update_objects(connection, validated_objects)
-                    logging.info(
-                        f"Updated {len(validated_objects)} objects in database."
-                    )
-                else:
-                    logging.warning(
-                        f"No validator found for classification: {classification}"
-                    )
-            if all(final.values()):
-                break
+        run_phase(
+            pool,
+            validators,
+            get_batchsizes(batching, "slow", validators),
+            history,
+            "slow",
+        )
 
     except hdbcli.dbapi.Error as e:
         logging.error(f"hdbcli.dbapi.Error: {e}")
@@ -96,11 +168,224 @@ def main():
         logging.info("Finished processing all classifications.")
 
     finally:
-        # Close connection
-        if connection:
+        # Close connections
+        if pool:
+            pool.close()
+        elif connection:
             connection.close()
 
 
+def run_server_side(pool, validators, history):
+    """
+    Runs the server-side SQL of all validators that provide one.
+
+    A validator may implement 'server_side_sql()', returning an UPDATE that takes the
+    classification and the history offset as parameters. It is executed before the
+    fast phase, so objects decided by it are not fetched into Python at all.
+
+    Args:
+        pool (ConnectionPool): The pool to take database connections from.
+        validators (dict): A mapping from classification to its validator instance.
+        history (int): Day offset for revisiting objects.
+    """
+    for classification, validator in validators.items():
+        server_side_sql = getattr(validator, "server_side_sql", None)
+        if server_side_sql is None:
+            continue
+        with pool.connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute(server_side_sql(), (classification, history))
+            connection.commit()
+        logging.info(f"Classification: {classification}")
+        logging.info(f"Updated {cursor.rowcount} objects in database (server-side).")
+
+
+def run_phase(pool, validators, batchsizes, history, mode):
+    """
+    Runs one validation phase as a three-stage fetch -> validate -> update pipeline.
+
+    The stages run in their own threads and hand batches over through queues, so
+    HANA can fetch or write one classification while another one is being validated
+    (e.g. IBANs are written back while URLs are still being pinged). Batches of
+    different classifications are also validated in parallel. A classification
+    only has one batch in flight at a time, because its next fetch has to see the
+    previous batch written back and committed. Each batch is written in one
+    transaction, which is rolled back if writing it fails. A classification is
+    finished for the phase once a fetch returns no objects or its validator
+    returns nothing to update.
+
+    Args:
+        pool (ConnectionPool): The pool to take database connections from.
+        validators (dict): A mapping from classification to its validator instance.
+        batchsizes (dict): A mapping from classification to its AdaptiveBatchSize.
+        history (int): Day offset for revisiting objects in "fast" mode.
+        mode (str): Either "fast" or "slow".
+
+    Raises:
+        Exception: The first exception raised by any of the stages.
+    """
+    ready = queue.Queue()
+    to_validate = queue.Queue(maxsize=1)
+    to_update = queue.Queue(maxsize=1)
+    errors = []
+    for classification in validators:
+        ready.put(classification)
+
+    def fail(e):
+        if not errors:
+            logging.error(f"Aborting {mode} validations: {e}")
+        errors.append(e)
+
+    def validate_batch(classification, objects, elapsed):
+        validated_objects = None
+        if not errors:
+            started = time.monotonic()
+            try:
+                logging.info(f"Classification: {classification}")
+                validator = validators[classification]
+                if mode == "fast":
+                    validated_objects = validator.validate_fast(objects)
+                else:
+                    validated_objects = validator.validate_slow(objects)
+            except Exception as e:
+                fail(e)
+            elapsed += time.monotonic() - started
+        to_update.put((classification, objects, validated_objects, elapsed))
+
+    def validate_stage():
+        # batches of different classifications are validated concurrently; a
+        # validator itself never runs twice at once, since its classification
+        # only has one batch in flight
+        with ThreadPoolExecutor(
+            max_workers=max(1, len(validators)), thread_name_prefix=f"{mode}-validate"
+        ) as executor:
+            while True:
+                batch = to_validate.get()
+                if batch is None:
+                    break
+                executor.submit(validate_batch, *batch)
+        to_update.put(None)
+
+    def update_stage(connection):
+        while True:
+            batch = to_update.get()
+            if batch is None:
+                return
+            classification, objects, validated_objects, elapsed = batch
+            done = validated_objects is None or len(validated_objects) == 0
+            try:
+                if not done and not errors:
+                    started = time.monotonic()
+                    update_objects(connection, validated_objects)
+                    # commit before handing the classification back, so its
+                    # next fetch sees this batch
+                    connection.commit()
+                    elapsed += time.monotonic() - started
+                    batchsizes[classification].record(elapsed, len(objects))
+                    logging.info(
+                        f"Updated {len(validated_objects)} objects in database."
+                    )
+            except Exception as e:
+                fail(e)
+                connection.rollback()
+            finally:
+                ready.put(None if done else classification)
+
+    def run_update_stage():
+        # hdbcli connections commit every statement by default, so autocommit is
+        # off while the stage holds its connection; each batch is then written in
+        # one transaction, however many statements update_objects needs for it
+        try:
+            with pool.connection() as connection:
+                connection.setautocommit(False)
+                try:
+                    update_stage(connection)
+                finally:
+                    try:
+                        connection.rollback()
+                    finally:
+                        connection.setautocommit(True)
+        except Exception as e:
+            fail(e)
+            # keep handing the classifications back until the validate stage is
+            # done, or the fetch stage would wait for them forever
+            while True:
+                batch = to_update.get()
+                if batch is None:
+                    break
+                ready.put(None)
+
+    stages = [
+        threading.Thread(target=validate_stage, name=f"{mode}-validate"),
+        threading.Thread(target=run_update_stage, name=f"{mode}-update"),
+    ]
+    for stage in stages:
+        stage.start()
+
+    # the fetch stage runs in the calling thread
+    remaining = len(validators)
+    try:
+        while remaining > 0:
+            classification = ready.get()
+            if classification is None or errors:
+                remaining -= 1
+                continue
+            started = time.monotonic()
+            with pool.connection() as connection:
+                objects = list(
+                    get_objects(
+                        connection,
+                        classification,
+                        batchsizes[classification].size,
+                        history,
+                        mode,
+                    )
+                )
+            if len(objects) == 0:
+                remaining -= 1
+                continue
+            to_validate.put((classification, objects, time.monotonic() - started))
+    except Exception as e:
+        fail(e)
+    finally:
+        to_validate.put(None)
+        for stage in stages:
+            stage.join()
+
+    if errors:
+        raise errors[0]
+
+
+def get_batchsizes(batching, mode, validators):
+    """
+    Creates one adaptive batch size controller per classification.
+
+    The configured 'batchsize_<mode>' is the starting point; the controller may move
+    between 'batchsize_<mode>_min' and 'batchsize_<mode>_max', both of which default
+    to the starting value so the batch size stays fixed unless bounds are configured.
+    A validator may provide a 'max_batchsize' mapping from mode to the largest batch
+    it can handle, which then caps the configured bounds for its classification.
+
+    Args:
+        batching (configparser.SectionProxy): The 'batching' section of 'config.ini'.
+        mode (str): Either "fast" or "slow".
+        validators (dict): A mapping from classification to its validator instance.
+
+    Returns:
+        dict: A mapping from classification to its AdaptiveBatchSize.
+    """
+    initial = batching.getint(f"batchsize_{mode}")
+    minimum = batching.getint(f"batchsize_{mode}_min", fallback=initial)
+    maximum = batching.getint(f"batchsize_{mode}_max", fallback=initial)
+    batchsizes = {}
+    for classification, validator in validators.items():
+        limit = getattr(validator, "max_batchsize", {}).get(mode, maximum)
+        batchsizes[classification] = AdaptiveBatchSize(
+            initial, minimum, min(maximum, limit)
+        )
+    return batchsizes
+
+
 def get_connection():
     """
     Establishes a connection to the HANA database using configuration details from 'config.ini'.
@@ -159,95 +444,145 @@ def get_classifications(connection):
 
 def get_objects(
     connection, classification, batchsize, history, mode
-) -> List[ValidationObject]:
+) -> Iterator[ValidationObject]:
     """
     Retrieve objects from the GENIUS.SHARED_NAIGENT_DATA table based on the classification.
 
     Args:
         connection (object): A database connection object.
         classification (str): The classification to filter the objects.
+        batchsize (int): The maximum number of objects to retrieve.
+        history (int): Day offset for revisiting objects in "fast" mode.
+        mode (str): Either "fast" or "slow", selects the prepared query.
 
-    Returns:
-        list: A list of tuples containing objects based on the classification.
+    Yields:
+        ValidationObject: The objects based on the classification, read from the
+            cursor in chunks of FETCH_SIZE rows.
     """
-    # Execute SQL query
-    query = f"""
-SELECT DISTINCT
-      CLASSIFICATION
-    , VALUE
-    , STATUS
-    , STATUS_MESSAGE
-    , LAST_VISITED
-    , ADDITIONAL_INFORMATION
-FROM
-	GENIUS.SHARED_NAIGENT_DATA 
-WHERE
-	CLASSIFICATION = '{classification}'"""
-    if mode == "fast":
-        query += f"""
-AND (LAST_VISITED IS NULL
-	OR LAST_VISITED < ADD_DAYS(CURRENT_DATE,{history}))"""
-    elif mode == "slow":
-        query += f"""
-AND STATUS = 'formal ok'"""
-    query += f"""        
-ORDER BY 
-	COALESCE(LAST_VISITED,'2000-01-01') ASC
-	, VALUE ASC
-LIMIT {batchsize}
-	"""
+    query = SELECT_QUERIES[mode]
     logging.debug(f"Query: {query}")
     cursor = connection.cursor()
-    cursor.execute(query)
+    if mode == "fast":
+        cursor.execute(query, (classification, history, batchsize))
+    else:
+        cursor.execute(query, (classification, batchsize))
+
+    # Stream results, keeping one object per value: the DISTINCT above spans the
+    # whole row, but rows sharing a value only need to be validated once, since
+    # update_objects writes the result back to all of them
+    seen = {}
+    while True:
+        rows = cursor.fetchmany(FETCH_SIZE)
+        if not rows:
+            break
+        for object in rows:
+            entry = seen.get(object[1])
+            if entry is not None:
+                # rows of the value disagree on their status, so the result has to
+                # be merged into all of them even if it matches the first row
+                kept, status = entry
+                if (object[2], object[3]) != status:
+                    kept.original_status = _MIXED_STATUS
+                continue
+            kept = ValidationObject(
+                classification=object[0],
+                value=object[1],
+                status=object[2],
+                status_message=object[3],
+                last_visited=None,
+                additional_information=object[5],
+                original_status=object[2],
+                original_status_message=object[3],
+            )
+            seen[object[1]] = (kept, (object[2], object[3]))
+            yield kept
+
+
+@functools.lru_cache(maxsize=16)
+def get_merge_query(rows: int) -> str:
+    """
+    Builds the MERGE statement for a given number of rows.
 
-    # Fetch results
-    objects = cursor.fetchall()
-    return [
-        ValidationObject(
-            classification=object[0],
-            value=object[1],
-            status=object[2],
-            status_message=object[3],
-            last_visited=None,
-            additional_information=object[5],
-        )
-        for object in objects
-    ]
+    update_objects only asks for the sizes returned by get_merge_size, so the
+    texts are cached per size.
+
+    Args:
+        rows (int): The number of rows the statement has to carry.
+
+    Returns:
+        str: A MERGE statement with 6 parameters per object.
+    """
+    return _MERGE_QUERY.format(
+        rows="\n    UNION ALL ".join([_MERGE_FIRST_ROW] + [_MERGE_ROW] * (rows - 1))
+    )
+
+
+def get_merge_size(objects: int) -> int:
+    """
+    Returns the number of rows of the MERGE statement that carries the given objects.
+
+    Args:
+        objects (int): The number of objects to write, at most MERGE_SIZE.
+
+    Returns:
+        int: The smallest power of two from _MERGE_MIN_SIZE up that fits them.
+    """
+    return max(_MERGE_MIN_SIZE, 1 << (objects - 1).bit_length())
 
 
 def update_objects(connection, objects: List[ValidationObject]):
     """
     Update the validated objects back into the GENIUS.SHARED_NAIGENT_DATA table.
 
+    Changed objects are written with one MERGE statement per MERGE_SIZE objects, so
+    HANA parses and executes a single statement instead of one UPDATE per row.
+    Objects whose status and status message are unchanged only get their
+    LAST_VISITED refreshed, in one batched UPDATE. Committing is left to the caller.
+
     Args:
         connection (object): A database connection object.
         objects (List[ValidationObject]): A list of validated objects to be updated.
     """
     cursor = connection.cursor()
-    query = """
-        UPDATE GENIUS.SHARED_NAIGENT_DATA
-        SET STATUS = ?, STATUS_MESSAGE = ?, LAST_VISITED = ?, ADDITIONAL_INFORMATION = ?
-        WHERE CLASSIFICATION = ? AND VALUE = ?
-    """
-
-    params = [
-        (
-            obj.status,
-            obj.status_message,
-            obj.last_visited,
-            obj.additional_information,
-            obj.classification,
-            obj.value,
-        )
-        for obj in objects
-        if obj.last_visited is not None
-    ]
 
-    cursor.executemany(query, params)
-    connection.commit()
+    params = []
+    visited_params = []
+    for obj in objects:
+        if obj.last_visited is None:
+            continue
+        if (obj.status, obj.status_message) == (
+            obj.original_status,
+            obj.original_status_message,
+        ):
+            visited_params.append((obj.last_visited, obj.classification, obj.value))
+            continue
+        params.append(
+            (
+                obj.status,
+                obj.status_message,
+                obj.last_visited,
+                obj.additional_information,
+                obj.classification,
+                obj.value,
+            )
+        )
+    if not params and not visited_params:
+        return
+
+    for start in range(0, len(params), MERGE_SIZE):
+        chunk = params[start : start + MERGE_SIZE]
+        rows = get_merge_size(len(chunk))
+        cursor.execute(
+            get_merge_query(rows),
+            [param for row in chunk for param in row]
+            + [None] * (len(_MERGE_COLUMNS) * (rows - len(chunk))),
+        )
+    if visited_params:
+        cursor.executemany(VISITED_QUERY, visited_params)
 
 
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
-main()
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+    main()
@@ -2,11 +2,14 @@ from dataclasses import dataclass
 from datetime import datetime
 
 
-@dataclass
+@dataclass(slots=True)
 class ValidationObject:
     classification: str
     value: str
     status: str
     status_message: str
     last_visited: datetime
-    additional_information: str 
+    additional_information: str
+    # status as read from the database, used to skip writing unchanged objects
+    original_status: str = None
+    original_status_message: str = None 
@@ -4,5 +4,6 @@ conda update -n base -c defaults conda
 conda activate genius
 conda update --all -y
 python --version
+python -c 'import sys; sys.exit(sys.version_info < (3, 10))' || { echo "genius needs Python 3.10 or newer" >&2; exit 1; }
 python -m pip install --upgrade pip
 pip install --upgrade -r requirements.txt
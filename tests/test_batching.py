@@ -0,0 +1,46 @@
+from batching import AdaptiveBatchSize
+
+
+def run(controller, seconds_per_batch, batches=20):
+    sizes = []
+    for _ in range(batches):
+        size = controller.size
+        controller.record(seconds_per_batch(size), size)
+        sizes.append(controller.size)
+    return sizes
+
+
+def test_flat_cost_keeps_the_size():
+    controller = AdaptiveBatchSize(200, 10, 1000)
+    assert run(controller, lambda size: 0.01 * size) == [400] * 20
+
+
+def test_fixed_cost_grows_to_the_maximum():
+    controller = AdaptiveBatchSize(100, 10, 1000)
+    sizes = run(controller, lambda size: 1.0 + 0.01 * size)
+    assert sizes[:4] == [200, 400, 800, 1000]
+    assert sizes[-1] == 1000
+
+
+def test_rising_cost_halves_and_settles():
+    # cheapest per object at 400; above that every object gets slower
+    controller = AdaptiveBatchSize(100, 10, 1000)
+    sizes = run(
+        controller, lambda size: 1.0 + 0.01 * size + (size > 400) * 0.0001 * size**2
+    )
+    assert sizes[:3] == [200, 400, 800]
+    assert sizes[-1] == 400
+    assert set(sizes[4:]) == {400}
+
+
+def test_partial_batches_are_ignored():
+    controller = AdaptiveBatchSize(100, 10, 1000)
+    controller.record(1.0, 50)
+    assert controller.size == 100
+
+
+def test_bounds():
+    controller = AdaptiveBatchSize(500, 10, 99)
+    assert controller.size == 99
+    controller.record(1.0, 99)
+    assert controller.size == 99
@@ -0,0 +1,42 @@
+import pytest
+
+from connection_pool import ConnectionPool
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_failed_connect_closes_opened_connections():
+    adopted = FakeConnection()
+    opened = []
+
+    def connect():
+        if len(opened) == 2:
+            raise ConnectionError("refused")
+        opened.append(FakeConnection())
+        return opened[-1]
+
+    with pytest.raises(ConnectionError):
+        ConnectionPool(connect, 4, [adopted])
+    assert all(connection.closed for connection in opened)
+    assert not adopted.closed
+
+
+def test_close_closes_all_connections():
+    connections = []
+
+    def connect():
+        connections.append(FakeConnection())
+        return connections[-1]
+
+    pool = ConnectionPool(connect, 2)
+    with pool.connection() as connection:
+        assert connection in connections
+    pool.close()
+    assert len(connections) == 2
+    assert all(connection.closed for connection in connections)
@@ -0,0 +1,226 @@
+import threading
+from datetime import date, datetime, time, timedelta
+
+import pytest
+
+import main
+from batching import AdaptiveBatchSize
+from connection_pool import ConnectionPool
+
+
+class FakeDatabase:
+    """
+    Keeps GENIUS.SHARED_NAIGENT_DATA in memory and answers the statements main sends.
+    """
+
+    def __init__(self, values, fail=()):
+        # (classification, value) -> [status, status message, last visited, info]
+        self.rows = {
+            (classification, value): [status, None, None, None]
+            for classification, value, status in values
+        }
+        self.connections = []
+        # operations that raise on every connection, e.g. "commit"
+        self.fail = set(fail)
+
+    def connect(self):
+        connection = FakeConnection(self)
+        self.connections.append(connection)
+        return connection
+
+    def select(self, classification, mode, history, limit):
+        cutoff = datetime.combine(date.today(), time()) + timedelta(days=history or 0)
+        rows = [
+            (key, row)
+            for key, row in self.rows.items()
+            if key[0] == classification
+            and (
+                row[0] == "formal ok"
+                if mode == "slow"
+                else row[2] is None or row[2] < cutoff
+            )
+        ]
+        rows.sort(key=lambda item: (item[1][2] is not None, item[1][2], item[0][1]))
+        return [
+            (key[0], key[1], row[0], row[1], row[2], row[3])
+            for key, row in rows[:limit]
+        ]
+
+
+class FakeConnection:
+    def __init__(self, database):
+        self.database = database
+        self.autocommit = True
+        self.pending = []
+
+    def _check(self, operation):
+        if operation in self.database.fail:
+            raise RuntimeError(f"{operation} failed")
+
+    def setautocommit(self, autocommit):
+        self._check("setautocommit")
+        self.autocommit = autocommit
+
+    def write(self, key, changes):
+        if key not in self.database.rows:
+            return
+        self.pending.append((key, changes))
+        if self.autocommit:
+            self.commit()
+
+    def commit(self):
+        self._check("commit")
+        for key, changes in self.pending:
+            for index, value in changes.items():
+                self.database.rows[key][index] = value
+        self.pending.clear()
+
+    def rollback(self):
+        self.pending.clear()
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def close(self):
+        pass
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.rows = []
+
+    def execute(self, query, params):
+        if query == main.SELECT_QUERIES["fast"]:
+            classification, history, limit = params
+            self.rows = self.connection.database.select(
+                classification, "fast", history, limit
+            )
+        elif query == main.SELECT_QUERIES["slow"]:
+            classification, limit = params
+            self.rows = self.connection.database.select(
+                classification, "slow", None, limit
+            )
+        elif query.lstrip().startswith("MERGE"):
+            self.connection._check("merge")
+            for start in range(0, len(params), 6):
+                status, message, visited, info, classification, value = params[
+                    start : start + 6
+                ]
+                self.connection.write(
+                    (classification, value),
+                    {0: status, 1: message, 2: visited, 3: info},
+                )
+        else:
+            raise AssertionError(f"unexpected query: {query}")
+
+    def executemany(self, query, params):
+        assert query == main.VISITED_QUERY
+        for visited, classification, value in params:
+            self.connection.write((classification, value), {2: visited})
+
+    def fetchmany(self, size):
+        rows, self.rows = self.rows[:size], self.rows[size:]
+        return rows
+
+
+class FakeValidator:
+    def __init__(self, status, fail_on_call=None):
+        self.status = status
+        self.fail_on_call = fail_on_call
+        self.calls = 0
+
+    def validate(self, objects):
+        self.calls += 1
+        if self.calls == self.fail_on_call:
+            raise ValueError("validator failed")
+        now = datetime.now()
+        for obj in objects:
+            obj.status = self.status
+            obj.status_message = ""
+            obj.last_visited = now
+        return objects
+
+    validate_fast = validate
+    validate_slow = validate
+
+
+def make_database(fail=()):
+    return FakeDatabase(
+        [("URL", f"https://example{i}.com", None) for i in range(25)]
+        + [("IBAN", f"DE{i:020d}", None) for i in range(13)]
+        + [("VAT_ID", f"DE{i:09d}", "formal ok") for i in range(7)],
+        fail,
+    )
+
+
+def run_phase(database, validators, mode="fast"):
+    pool = ConnectionPool(database.connect, 2)
+    batchsizes = {
+        classification: AdaptiveBatchSize(10, 10, 10) for classification in validators
+    }
+    errors = []
+
+    def run():
+        try:
+            main.run_phase(pool, validators, batchsizes, -30, mode)
+        except Exception as e:
+            errors.append(e)
+
+    # run_phase must return even if a stage fails, so it runs with a time limit
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(10)
+    assert not thread.is_alive(), "run_phase did not return"
+    if errors:
+        raise errors[0]
+
+
+def statuses(database, classification):
+    return [
+        row[0] for key, row in database.rows.items() if key[0] == classification
+    ]
+
+
+def test_fast_phase_validates_all_objects():
+    database = make_database()
+    validators = {
+        "URL": FakeValidator("formal ok"),
+        "IBAN": FakeValidator("check"),
+    }
+    run_phase(database, validators)
+    assert statuses(database, "URL") == ["formal ok"] * 25
+    assert statuses(database, "IBAN") == ["check"] * 13
+    # three full batches and the final empty fetch for 25 URLs
+    assert validators["URL"].calls == 3
+    assert all(connection.autocommit for connection in database.connections)
+
+
+def test_slow_phase_validates_formal_ok_objects():
+    database = make_database()
+    run_phase(database, {"VAT_ID": FakeValidator("ok")}, mode="slow")
+    assert statuses(database, "VAT_ID") == ["ok"] * 7
+
+
+def test_validator_exception_is_raised():
+    database = make_database()
+    validators = {
+        "URL": FakeValidator("formal ok", fail_on_call=2),
+        "IBAN": FakeValidator("check"),
+    }
+    with pytest.raises(ValueError):
+        run_phase(database, validators)
+    # the first URL batch was written before the failure, the failed one was not
+    assert statuses(database, "URL").count("formal ok") == 10
+
+
+@pytest.mark.parametrize("operation", ["setautocommit", "merge", "commit"])
+def test_failed_update_is_raised_and_rolled_back(operation):
+    database = make_database(fail={operation})
+    with pytest.raises(RuntimeError, match=operation):
+        run_phase(
+            database,
+            {"URL": FakeValidator("formal ok"), "IBAN": FakeValidator("check")},
+        )
+    assert statuses(database, "URL") == [None] * 25
+    assert statuses(database, "IBAN") == [None] * 13
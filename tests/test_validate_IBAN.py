@@ -0,0 +1,58 @@
+import random
+import string
+
+import pytest
+
+from validate_IBAN import validate_IBAN
+
+
+@pytest.fixture
+def validator():
+    return validate_IBAN()
+
+
+def checksum_reference(iban):
+    # the checksum as it was written before the translate table was introduced
+    rearranged_iban = iban[4:] + iban[:4]
+    numeric_iban = "".join(str(int(ch, 36)) for ch in rearranged_iban)
+    return int(numeric_iban) % 97 == 1
+
+
+_LETTER_DIGITS = str.maketrans({c: str(int(c, 36)) for c in string.ascii_uppercase})
+
+
+def with_check_digits(rng, country, bban):
+    # computes the correct check digits and spoils half of them, so the samples
+    # contain valid as well as invalid IBANs
+    check = 98 - int((bban + country + "00").translate(_LETTER_DIGITS)) % 97
+    if rng.random() < 0.5:
+        check = (check + rng.randint(1, 96)) % 100
+    return f"{country}{check:02d}{bban}"
+
+
+@pytest.mark.parametrize(
+    "iban", ["DE89370400440532013000", "GB82WEST12345698765432", "de89370400440532013000"]
+)
+def test_checksum_accepts_valid_ibans(validator, iban):
+    assert validator.is_valid_iban_checksum(iban)
+
+
+def test_checksum_rejects_changed_digit(validator):
+    assert not validator.is_valid_iban_checksum("DE89370400440532013001")
+
+
+def test_checksums_match_reference(validator):
+    rng = random.Random(0)
+    alphabet = string.digits + string.ascii_letters
+    ibans = [
+        with_check_digits(
+            rng,
+            "".join(rng.choice(string.ascii_uppercase) for _ in range(2)),
+            "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 30))).upper(),
+        )
+        for _ in range(20000)
+    ]
+    expected = [checksum_reference(iban) for iban in ibans]
+    assert [validator.is_valid_iban_checksum(iban) for iban in ibans] == expected
+    assert validator.are_valid_iban_checksums(ibans) == expected
+    assert any(expected) and not all(expected)
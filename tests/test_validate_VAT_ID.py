@@ -0,0 +1,237 @@
+import random
+import types
+
+import pytest
+
+from model import ValidationObject
+import validate_VAT_ID as validate_VAT_ID_module
+from validate_VAT_ID import validate_VAT_ID
+
+
+@pytest.fixture
+def validator():
+    return validate_VAT_ID()
+
+
+def random_digits(rng, count):
+    return "".join(rng.choice("0123456789") for _ in range(count))
+
+
+# reference implementations, as the checksums were written before they were optimized
+
+
+def german_reference(number):
+    if len(number) != 9 or not number.isdigit():
+        return False
+    product = 10
+    for i in range(8):
+        sum_ = (int(number[i]) + product) % 10
+        if sum_ == 0:
+            sum_ = 10
+        product = (2 * sum_) % 11
+    check = 11 - product
+    if check == 10:
+        check = 0
+    return check == int(number[8])
+
+
+def austrian_reference(number):
+    if len(number) != 9 or not number.startswith("U"):
+        return False
+    digits = [int(d) for d in number[1:8]]
+    weights = [1, 2, 1, 2, 1, 2, 1]
+    total = 0
+    for i in range(7):
+        product = digits[i] * weights[i]
+        total += product if product < 10 else (product // 10 + product % 10)
+    return (10 - (total + 4) % 10) % 10 == int(number[8])
+
+
+def swiss_reference(number):
+    if len(number) != 9 or not number.isdigit():
+        return False
+    weights = [5, 4, 3, 2, 7, 6, 5, 4]
+    check = 11 - sum(int(number[i]) * weights[i] for i in range(8)) % 11
+    if check == 10:
+        return False
+    elif check == 11:
+        check = 0
+    return check == int(number[8])
+
+
+def italian_reference(number):
+    if len(number) != 11 or not number.isdigit():
+        return False
+    s = 0
+    for i in range(10):
+        n = int(number[i])
+        if i % 2 == 0:
+            s += n
+        else:
+            n = 2 * n
+            s += n if n < 10 else n - 9
+    return (10 - (s % 10)) % 10 == int(number[10])
+
+
+def swedish_reference(number):
+    if len(number) != 12 or not number.isdigit():
+        return False
+    total = 0
+    for i, digit in enumerate(number[:10]):
+        n = int(digit)
+        if i % 2 == 0:
+            n *= 2
+        total += n if n < 10 else (n // 10 + n % 10)
+    return (10 - (total % 10)) % 10 == int(number[10])
+
+
+@pytest.mark.parametrize("number", ["0417497106", "0403170701", "0202239951"])
+def test_belgian_checksum_accepts_real_numbers(validator, number):
+    assert validator._is_valid_belgian_vat_checksum(number)
+
+
+@pytest.mark.parametrize(
+    "number",
+    [
+        "0417497107",  # check number off by one
+        "0417497105",
+        "0563431297",  # accepted when digit 8 was counted in base and check number
+        "417497106",  # too short
+        "1417497106",  # no leading 0
+    ],
+)
+def test_belgian_checksum_rejects_invalid_numbers(validator, number):
+    assert not validator._is_valid_belgian_vat_checksum(number)
+
+
+@pytest.mark.parametrize(
+    "method, reference, make_number",
+    [
+        ("_is_valid_german_vat_checksum", german_reference, lambda r: random_digits(r, 9)),
+        (
+            "_is_valid_austrian_vat_checksum",
+            austrian_reference,
+            lambda r: "U" + random_digits(r, 8),
+        ),
+        ("_is_valid_swiss_vat_checksum", swiss_reference, lambda r: random_digits(r, 9)),
+        (
+            "_is_valid_italian_vat_checksum",
+            italian_reference,
+            lambda r: random_digits(r, 11),
+        ),
+        (
+            "_is_valid_swedish_vat_checksum",
+            swedish_reference,
+            lambda r: random_digits(r, 12),
+        ),
+    ],
+)
+def test_checksum_matches_reference(validator, method, reference, make_number):
+    rng = random.Random(method)
+    checksum = getattr(validator, method)
+    numbers = [make_number(rng) for _ in range(20000)]
+    assert [checksum(n) for n in numbers] == [reference(n) for n in numbers]
+    # the samples have to contain valid numbers for the comparison to mean anything
+    assert any(checksum(n) for n in numbers)
+
+
+@pytest.mark.parametrize(
+    "vat_id",
+    ["DE136695976", "ATU13585627", "IT00743110157", "BE0417497106", "de 136 695 976"],
+)
+def test_validate_fast_accepts_valid_ids(validator, vat_id):
+    objects = validator.validate_fast(
+        [ValidationObject("VAT_ID", vat_id, None, None, None, None)]
+    )
+    assert objects[0].status == "formal ok"
+
+
+@pytest.mark.parametrize(
+    "vat_id, status_message",
+    [
+        ("DE136695977", "Invalid VAT ID checksum"),
+        ("DE13669597", "Invalid VAT ID syntax"),
+        ("XX123456789", "Invalid VAT ID syntax"),
+        ("DE13669597٥", "Invalid VAT ID syntax"),
+    ],
+)
+def test_validate_fast_rejects_invalid_ids(validator, vat_id, status_message):
+    objects = validator.validate_fast(
+        [ValidationObject("VAT_ID", vat_id, None, None, None, None)]
+    )
+    assert objects[0].status == "check"
+    assert objects[0].status_message == status_message
+
+
+@pytest.mark.parametrize(
+    "vat_id, status",
+    [
+        ("DE136695977", "formal ok"),  # checksums are left to the API
+        ("DE13669597", "check"),
+        ("ATU1358562", "check"),
+        ("XX123456789", "check"),
+    ],
+)
+def test_validate_fast_skip_syntax_keeps_client_format_check(validator, vat_id, status):
+    objects = validator.validate_fast(
+        [ValidationObject("VAT_ID", vat_id, None, None, None, None)], skip_syntax=True
+    )
+    assert objects[0].status == status
+
+
+class FakeVIESClient:
+    def __init__(self):
+        self.batches = []
+        self.singles = []
+
+    def get_account_status(self):
+        return types.SimpleNamespace(total_count=0, limit=100)
+
+    @staticmethod
+    def _vies_data(vat_id):
+        return types.SimpleNamespace(
+            country_code=vat_id[:2], vat_number=vat_id[2:], valid=True, trader_name="X"
+        )
+
+    def get_vies_data(self, vat_id):
+        self.singles.append(vat_id)
+        return self._vies_data(vat_id)
+
+    def get_vies_data_async(self, vat_ids):
+        assert 2 <= len(vat_ids) <= 99
+        self.batches.append(vat_ids)
+        return "token"
+
+    def get_vies_data_async_result(self, token):
+        return types.SimpleNamespace(
+            numbers=[self._vies_data(vat_id) for vat_id in self.batches[-1]]
+        )
+
+
+@pytest.fixture
+def vies_client(monkeypatch):
+    client = FakeVIESClient()
+    monkeypatch.setattr(validate_VAT_ID_module, "_get_viesapi_client", lambda: client)
+    return client
+
+
+@pytest.mark.parametrize(
+    "values, batches, singles",
+    [
+        (["DE136695976", "de 136 695 976"], [], ["DE136695976"]),
+        (
+            ["DE136695976", "de136695976", "ATU13585627"],
+            [["DE136695976", "ATU13585627"]],
+            [],
+        ),
+    ],
+)
+def test_validate_slow_checks_every_value(
+    validator, vies_client, values, batches, singles
+):
+    objects = [ValidationObject("VAT_ID", v, None, None, None, None) for v in values]
+    validated = validator.validate_slow(objects)
+    assert vies_client.batches == batches
+    assert vies_client.singles == singles
+    assert validated == objects
+    assert all(obj.status == "ok" for obj in objects)
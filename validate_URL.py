@@ -1,18 +1,142 @@
+from collections import defaultdict
+import configparser
 from datetime import datetime
 import logging
-from typing import List
+from typing import Dict, List, Tuple
 import re
+import urllib.parse
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
+import dns_cache
 from model import ValidationObject
 
+# default number of concurrent pings, also the number of pooled connections
+# per host; can be raised with 'max_workers' in the 'url' section of config.ini
+_POOL_SIZE = 64
+
+# browser-like headers sent with every ping, since many sites reject obvious bots
+_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/114.0.0.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.5",
+    "Connection": "keep-alive",
+}
+
+# seconds to wait for a connection and for each read, so dead hosts release
+# their worker quickly
+_TIMEOUT = (2, 4)
+
+# largest response body that is still read to keep its connection alive
+_DRAIN_LIMIT = 64 * 1024
+
+_SCHEMES = ("http://", "https://", "ftp://", "ftps://")
+# only needed for upper- or mixed-case schemes, see _has_scheme
+_SCHEME_RE = re.compile(r"^(?:http|ftp)s?://", re.IGNORECASE)
+_URL_RE = re.compile(
+    r"^(?:http|ftp)s?://"  # http:// or https://
+    r"(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+(?:[A-Z]{2,6}\.?|[A-Z0-9-]{2,}\.?)|"  # domain...
+    r"localhost|"  # localhost...
+    r"\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}|"  # ...or ipv4
+    r"\[?[A-F0-9]*:[A-F0-9:]+\]?)"  # ...or ipv6
+    r"(?::\d+)?"  # optional port
+    r"(?:/?|[/?]\S+)$",
+    re.IGNORECASE,
+)
+
+
+def _has_scheme(url: str) -> bool:
+    """
+    Checks if the given URL starts with one of the supported schemes.
+
+    The plain prefix test settles the common lower-case case in a single C call;
+    the regex is only consulted when it fails.
+    """
+    return url.startswith(_SCHEMES) or _SCHEME_RE.match(url) is not None
+
+
+def _with_scheme(url: str) -> str:
+    """
+    Returns the given URL, prefixed with "http://" if it has no supported scheme.
+    """
+    return url if _has_scheme(url) else "http://" + url
+
 
 class validate_URL:
     """
     A class to validate URLs in several steps: syntax check, ping, and HTTP status check.
     """
 
+    def __init__(self):
+        config = configparser.ConfigParser()
+        config.read("config.ini")
+        pool_size = config.getint("url", "max_workers", fallback=_POOL_SIZE)
+
+        # resolve each host once per TTL instead of once per new connection
+        dns_cache.install()
+
+        # one session for all pings, so keep-alive connections (and their TLS
+        # handshakes) are reused across URLs, worker threads and batches
+        self._session = requests.Session()
+        self._session.headers.update(_HEADERS)
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            # one quick retry for dropped connections, slow reads and overloaded
+            # gateways; the last response is returned instead of raising, and a
+            # Retry-After header is ignored, since it may ask for hours of waiting
+            max_retries=Retry(
+                total=2,
+                connect=1,
+                read=1,
+                backoff_factor=0.1,
+                status_forcelist=(502, 503, 504),
+                allowed_methods=("HEAD", "GET"),
+                raise_on_status=False,
+                respect_retry_after_header=False,
+            ),
+        )
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        # worker threads are started once and then reused by every slow batch
+        self._executor = ThreadPoolExecutor(
+            max_workers=pool_size, thread_name_prefix="validate_URL"
+        )
+
+    def validate(
+        self, objects: List[ValidationObject], network: bool = True
+    ) -> List[ValidationObject]:
+        """
+        Validates a list of ValidationObject instances in a single pass: the URL syntax
+        is checked first, and only URLs with a valid syntax are pinged afterwards.
+        Each URL gets its scheme added once and is used as is by both steps.
+
+        Args:
+            objects (List[ValidationObject]): A list of ValidationObject instances to be validated.
+            network (bool): Whether to ping the URLs with a valid syntax. If False,
+                this is the same as validate_fast.
+
+        Returns:
+            List[ValidationObject]: The list of ValidationObject instances with updated status fields.
+        """
+        urls = [_with_scheme(obj.value) for obj in objects]
+        self._check_syntax(objects, urls)
+        if network:
+            self._ping_objects(
+                [
+                    (obj, url)
+                    for obj, url in zip(objects, urls)
+                    if obj.status == "formal ok"
+                ]
+            )
+        return objects
+
     def validate_fast(self, objects: List[ValidationObject]) -> List[ValidationObject]:
         """
         Validates a list of ValidationObject instances by checking URL syntax.
@@ -24,43 +148,85 @@ class validate_URL:
         Returns:
             List[ValidationObject]: The list of ValidationObject instances with updated status fields.
         """
-        for obj in objects:
-            logging.info(f"Validating URL: {obj.value}")
-            obj.last_visited = datetime.now()
-            url = obj.value
+        self._check_syntax(objects, [obj.value for obj in objects])
+        return objects
+
+    def validate_slow(self, objects: List[ValidationObject]) -> List[ValidationObject]:
+        self._ping_objects([(obj, obj.value) for obj in objects])
+        return objects
 
-            # Add scheme if missing
-            if not re.match(r"^(?:http|ftp)s?://", url):
-                url = "http://" + url
+    def _check_syntax(self, objects: List[ValidationObject], urls: List[str]):
+        """
+        Sets the status of each object from the syntax of its URL.
+
+        Args:
+            objects (List[ValidationObject]): The ValidationObject instances to be updated.
+            urls (List[str]): The URL of each object, with or without a scheme.
+        """
+        now = datetime.now()
+        debug = logging.debug
+        for obj, valid in zip(objects, self.is_valid_url_batch(urls)):
+            debug("Validating URL: %s", obj.value)
+            obj.last_visited = now
 
-            if not self.is_valid_url(url):
+            if not valid:
                 obj.status = "check"
                 obj.status_message = "Invalid URL syntax"
                 continue
 
             obj.status = "formal ok"
             obj.status_message = "API check outstanding"
-            
-        return objects
 
-    def validate_slow(self, objects: List[ValidationObject]) -> List[ValidationObject]:
-        def validate_object(obj):
+        formal_ok = sum(obj.status == "formal ok" for obj in objects)
+        logging.info(
+            f"Validated {len(objects)} URLs: {formal_ok} formal ok, "
+            f"{len(objects) - formal_ok} check"
+        )
+
+    def _ping_objects(self, pairs: List[Tuple[ValidationObject, str]]):
+        """
+        Sets the status of each object from a ping of its URL.
+
+        Args:
+            pairs (List[Tuple[ValidationObject, str]]): The ValidationObject instances
+                to be updated, each with its URL (with or without a scheme).
+        """
+        now = datetime.now()
+        # hosts that could not be connected to in this batch, with the reason
+        unreachable_hosts = {}
+
+        def validate_object(obj, url):
             try:
-                logging.info(f"Validating URL: {obj.value}")
-                obj.last_visited = datetime.now()
-                obj.status, obj.status_message = self.ping_url(obj.value)
+                logging.debug("Validating URL: %s", obj.value)
+                obj.last_visited = now
+                obj.status, obj.status_message = self.ping_url(url, unreachable_hosts)
             except Exception as e:
                 obj.status = "check"
                 obj.status_message = f"Unhandled exception: {str(e)}"
                 logging.exception(f"Unexpected error during validation of {obj.value}")
             return obj
 
-        with ThreadPoolExecutor() as executor:
-            futures = [executor.submit(validate_object, obj) for obj in objects]
-            for future in as_completed(futures):
-                future.result()
+        def validate_host(host_pairs):
+            for obj, url in host_pairs:
+                validate_object(obj, url)
 
-        return objects
+        # one task per host pings its URLs one after another over the same
+        # keep-alive connection; the executor parallelizes across hosts
+        by_host = defaultdict(list)
+        for obj, url in pairs:
+            by_host[self.get_host(url)].append((obj, url))
+        futures = [
+            self._executor.submit(validate_host, host_pairs)
+            for host_pairs in by_host.values()
+        ]
+        for future in as_completed(futures):
+            future.result()
+
+        reachable = sum(obj.status == "ok" for obj, _ in pairs)
+        logging.info(
+            f"Pinged {len(pairs)} URLs on {len(by_host)} hosts: {reachable} ok, "
+            f"{len(pairs) - reachable} check"
+        )
 
     def is_valid_url(self, url: str) -> bool:
         """
@@ -72,61 +238,116 @@ class validate_URL:
         Returns:
             bool: True if the URL has a valid syntax, False otherwise.
         """
-        regex = re.compile(
-            r"^(?:http|ftp)s?://"  # http:// or https://
-            r"(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+(?:[A-Z]{2,6}\.?|[A-Z0-9-]{2,}\.?)|"  # domain...
-            r"localhost|"  # localhost...
-            r"\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}|"  # ...or ipv4
-            r"\[?[A-F0-9]*:[A-F0-9:]+\]?)"  # ...or ipv6
-            r"(?::\d+)?"  # optional port
-            r"(?:/?|[/?]\S+)$",
-            re.IGNORECASE,
-        )
-        return re.match(regex, url) is not None
+        return _URL_RE.match(url) is not None
+
+    def is_valid_url_batch(self, urls: List[str]) -> List[bool]:
+        """
+        Checks the syntax of several URLs at once. URLs without a scheme are
+        checked as if they started with "http://".
+
+        Args:
+            urls (List[str]): The URLs to be checked.
+
+        Returns:
+            List[bool]: For each URL, True if it has a valid syntax, False otherwise.
+        """
+        # bound once, so the loop does not look the methods up for every URL
+        scheme_match = _SCHEME_RE.match
+        url_match = _URL_RE.match
+        return [
+            url_match(
+                url
+                if url.startswith(_SCHEMES) or scheme_match(url) is not None
+                else "http://" + url
+            )
+            is not None
+            for url in urls
+        ]
+
+    def get_host(self, url: str) -> str:
+        """
+        Extracts the lower-cased host (including the port) of the given URL.
+
+        Args:
+            url (str): The URL, with or without scheme.
 
-    def ping_url(self, url: str) -> (str, str):
+        Returns:
+            str: The host of the URL, or an empty string if it cannot be parsed.
+        """
+        url = _with_scheme(url)
+        try:
+            return urllib.parse.urlsplit(url).netloc.lower()
+        except ValueError:
+            return ""
+
+    def _release_response(self, response: requests.Response):
+        """
+        Reads the body of a streamed response if it is announced as small.
+
+        A fully read response hands its connection back to the session's pool for
+        the next URL on the same host. Large or chunked bodies are left unread and
+        the connection is dropped when the response is closed, since downloading
+        them would cost more than a new connection.
+
+        Args:
+            response (requests.Response): A response requested with stream=True.
+        """
+        try:
+            length = int(response.headers.get("Content-Length", ""))
+        except ValueError:
+            return
+        if length <= _DRAIN_LIMIT:
+            try:
+                response.content
+            except requests.exceptions.RequestException:
+                pass
+
+    def ping_url(
+        self, url: str, unreachable_hosts: Dict[str, str] = None
+    ) -> (str, str):
         """
         Checks if the given URL is reachable via a GET request with browser-like headers.
         Interprets 403 as "ok". Catches invalid IPv6 URLs and other parsing errors gracefully.
 
         Args:
             url (str): The URL to be checked.
+            unreachable_hosts (Dict[str, str], optional): Hosts known to be unreachable,
+                mapped to the failure reason. URLs on these hosts are not requested
+                again, and hosts that fail to connect are added.
 
         Returns:
             tuple: ("ok", "") if reachable or bot-blocked, ("check", <reason>) otherwise.
         """
-        import urllib.parse
+        url = _with_scheme(url)
 
         try:
-            parsed = urllib.parse.urlparse(url)
+            host = urllib.parse.urlsplit(url).netloc.lower()
         except ValueError as parse_err:
             logging.warning(f"URL parsing failed: {url} - {parse_err}")
             return "check", f"URL parsing failed: {parse_err}"
 
-        if not parsed.scheme:
-            url = "http://" + url
-
-        headers = {
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/114.0.0.0 Safari/537.36"
-            ),
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-            "Accept-Language": "en-US,en;q=0.5",
-            "Connection": "keep-alive"
-        }
+        if unreachable_hosts is not None and host in unreachable_hosts:
+            return "check", unreachable_hosts[host]
 
         try:
-            logging.info(f"Checking URL via GET: {url}")
-            response = requests.get(url, allow_redirects=True, timeout=5, headers=headers)
-            if response.status_code == 403:
-                return "ok", "HTTP 403 blocked bot-like client (interpreted as reachable)"
-            if response.status_code < 400:
-                return "ok", ""
-            else:
-                return "check", f"HTTP error: {response.status_code}"
+            logging.debug("Checking URL via GET: %s", url)
+            # only the status is needed, so the body is not downloaded up front
+            with self._session.get(
+                url, allow_redirects=True, timeout=_TIMEOUT, stream=True
+            ) as response:
+                self._release_response(response)
+                if response.status_code == 403:
+                    return "ok", "HTTP 403 blocked bot-like client (interpreted as reachable)"
+                if response.status_code < 400:
+                    return "ok", ""
+                else:
+                    return "check", f"HTTP error: {response.status_code}"
         except requests.exceptions.SSLError as ssl_err:
             return "check", f"SSL error: {ssl_err}"
+        except requests.exceptions.ConnectionError as conn_err:
+            status_message = f"Exception: {conn_err}"
+            if unreachable_hosts is not None:
+                unreachable_hosts[host] = status_message
+            return "check", status_message
         except requests.exceptions.RequestException as e:
             return "check", f"Exception: {e}"
\ No newline at end of file
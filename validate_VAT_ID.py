@@ -1,42 +1,174 @@
+from collections import defaultdict
 import configparser
+import functools
 from datetime import datetime
 import time
 import json
 import logging
 from typing import List
 import re
-from viesapi import VIESAPIClient, Error
+import string
+from viesapi import VIESAPIClient, EUVAT, Error
 
 from model import ValidationObject
 
 
+# syntax of the number part of a VAT ID (after the country code), by country code;
+# VAT IDs are plain ASCII, so \d does not need to consider other digits
+_VAT_PATTERNS = {
+    country_code: re.compile(pattern, re.ASCII)
+    for country_code, pattern in {
+        "AT": r"U\d{8}$",
+        "BE": r"0\d{9}$",
+        "BG": r"\d{9,10}$",
+        "CY": r"\d{8}[A-Z]$",
+        "CZ": r"\d{8,10}$",
+        "DE": r"\d{9}$",
+        "DK": r"\d{8}$",
+        "EE": r"\d{9}$",
+        "EL": r"\d{9}$",
+        "ES": r"[A-Z0-9]\d{7}[A-Z0-9]$",
+        "FI": r"\d{8}$",
+        "FR": r"[A-Z0-9]{2}\d{9}$",
+        "HR": r"\d{11}$",
+        "HU": r"\d{8}$",
+        "IE": r"\d{7}[A-W][A-I]?$",
+        "IT": r"\d{11}$",
+        "LT": r"(?:\d{9}|\d{12})$",
+        "LU": r"\d{8}$",
+        "LV": r"\d{11}$",
+        "MT": r"\d{8}$",
+        "NL": r"\d{9}B\d{2}$",
+        "PL": r"\d{10}$",
+        "PT": r"\d{9}$",
+        "RO": r"\d{2,10}$",
+        "SE": r"\d{12}$",
+        "SI": r"\d{8}$",
+        "SK": r"\d{10}$",
+    }.items()
+}
+
+# One step of the German ISO 7064 MOD 11,10 checksum, indexed by the running
+# product (0-10) and the ASCII code of the next digit, so the digits of an
+# encoded number can be used as indices directly (non-digit codes map to None)
+_DE_CHECKSUM_STEP = [
+    [
+        (2 * (((code - 48 + product) % 10) or 10)) % 11 if 48 <= code <= 57 else None
+        for code in range(256)
+    ]
+    for product in range(11)
+]
+
+# upper-cases ASCII letters and removes whitespace in a single pass, so VAT IDs
+# written with spaces are accepted as well
+_NORMALIZE_TABLE = str.maketrans(
+    string.ascii_lowercase, string.ascii_uppercase, " \t\n\r"
+)
+
+# fields of a VIES result stored as additional information, in the order of the
+# VIESData attributes so the stored JSON keeps its layout
+_TRADER_KEYS = (
+    "country_code",
+    "vat_number",
+    "trader_name",
+    "trader_company_type",
+    "trader_address",
+    "trader_address_components",
+    "source",
+)
+
+# polling of VIES batch results: first delay, longest delay and default total wait in
+# seconds; the total can be changed with 'poll_timeout' in the 'viesapi' section
+_POLL_DELAY = 0.1
+_POLL_MAX_DELAY = 10.0
+_POLL_TIMEOUT = 300.0
+
+# digit sum of twice a digit, indexed by the digit (used by the Luhn-style checksums)
+_DOUBLED_DIGIT_SUM = (0, 2, 4, 6, 8, 1, 3, 5, 7, 9)
+
+# map the ASCII digits of an encoded number to their values (or to the digit sum of
+# their doubled values), so whole slices can be converted with one bytes.translate
+_DIGIT_VALUES = bytes.maketrans(b"0123456789", bytes(range(10)))
+_DOUBLED_DIGIT_VALUES = bytes.maketrans(b"0123456789", bytes(_DOUBLED_DIGIT_SUM))
+
+
+@functools.lru_cache(maxsize=1)
+def _get_viesapi_client() -> VIESAPIClient:
+    """
+    Returns the VIES API client of the process, creating it from the credentials in
+    the 'viesapi' section of config.ini on first use. Creating it lazily means fast
+    validation does not need VIES credentials.
+
+    Returns:
+        VIESAPIClient: The client shared by all slow validation batches.
+    """
+    config = configparser.ConfigParser()
+    config.read("config.ini")
+    viesapicredentials = config["viesapi"]
+    return VIESAPIClient(viesapicredentials["Identifier"], viesapicredentials["Key"])
+
+
 class validate_VAT_ID:
     """
     A class to validate European VAT IDs by checking their syntax and checksum.
     """
 
-    def validate_fast(self, objects: List[ValidationObject]) -> List[ValidationObject]:
+    # the VIES API refuses batch requests with more than 99 numbers
+    max_batchsize = {"slow": 99}
+
+    def __init__(self):
+        config = configparser.ConfigParser()
+        config.read("config.ini")
+        self._poll_timeout = config.getfloat(
+            "viesapi", "poll_timeout", fallback=_POLL_TIMEOUT
+        )
+
+    def validate_fast(
+        self, objects: List[ValidationObject], *, skip_syntax: bool = False
+    ) -> List[ValidationObject]:
         """
         Validates a list of ValidationObject instances by checking VAT ID syntax and checksum.
         Updates the status field of each ValidationObject.
 
         Args:
             objects (List[ValidationObject]): A list of ValidationObject instances to be validated.
+            skip_syntax (bool): Skip the local syntax and checksum checks and only run
+                the VIES client's own format check (EUVAT.is_valid), leaving the rest
+                to the VIES API check of validate_slow. The client rejects a whole
+                batch if one number fails that check, so it is still needed here.
 
         Returns:
             List[ValidationObject]: The list of ValidationObject instances with updated status fields.
         """
+        now = datetime.now()
         for obj in objects:
-            logging.info(f"Validating VAT_ID: {obj.value}")
-            obj.last_visited = datetime.now()
-            vat_id = obj.value
+            logging.debug("Validating VAT_ID: %s", obj.value)
+            obj.last_visited = now
+            vat_id = obj.value.translate(_NORMALIZE_TABLE)
+
+            if skip_syntax:
+                if EUVAT.is_valid(vat_id):
+                    obj.status = "formal ok"
+                    obj.status_message = "API check outstanding"
+                else:
+                    obj.status = "check"
+                    obj.status_message = "Invalid VAT ID syntax"
+                continue
 
-            if not self.is_valid_vat_syntax(vat_id):
+            # the country code is looked up and the number sliced off only once,
+            # for both the syntax and the checksum check
+            dispatch = (
+                _COUNTRY_DISPATCH.get(vat_id[:2])
+                if len(vat_id) >= 4 and vat_id.isascii()
+                else None
+            )
+            number = vat_id[2:]
+            if dispatch is None or dispatch[0].match(number) is None:
                 obj.status = "check"
                 obj.status_message = "Invalid VAT ID syntax"
                 continue
 
-            if not self.is_valid_vat_checksum(vat_id):
+            if dispatch[1] is not None and not dispatch[1](number):
                 obj.status = "check"
                 obj.status_message = "Invalid VAT ID checksum"
                 continue
@@ -45,6 +177,11 @@ class validate_VAT_ID:
             obj.status = "formal ok"
             obj.status_message = "API check outstanding"
 
+        formal_ok = sum(obj.status == "formal ok" for obj in objects)
+        logging.info(
+            f"Validated {len(objects)} VAT IDs: {formal_ok} formal ok, "
+            f"{len(objects) - formal_ok} check"
+        )
         return objects
 
     def validate_slow(self, objects: List[ValidationObject]) -> List[ValidationObject]:
@@ -58,22 +195,19 @@ class validate_VAT_ID:
             List[ValidationObject]: The list of ValidationObject instances with updated status fields.
         """
 
-        # initialize VIES API client
-        config = configparser.ConfigParser()
-        config.read("config.ini")
-        viesapicredentials = config["viesapi"]
-        viesapi = VIESAPIClient(
-            viesapicredentials["Identifier"], viesapicredentials["Key"]
-        )
+        viesapi = _get_viesapi_client()
 
         # check if we have reached the limit of API calls
         # if yes, return the objects with status "check"
         # if no, continue with the validation
         account = viesapi.get_account_status()
         if account:
-            logging.info(f"Account status:")
             varsaccount = vars(account)
-            logging.info(json.dumps(varsaccount, indent=4, default=str))
+            # only serialized if the message is actually logged
+            if logging.getLogger().isEnabledFor(logging.INFO):
+                logging.info(
+                    "Account status:\n%s", json.dumps(varsaccount, indent=4, default=str)
+                )
             if varsaccount["total_count"] >= varsaccount["limit"]:
                 logging.info("Account status: limit reached")
                 return None
@@ -82,13 +216,80 @@ class validate_VAT_ID:
             logging.info(viesapi.get_last_error())
             return None
 
-        # setup the list of VATIDs to be checked
-        vat_ids = [obj.value for obj in objects]
+        # setup the list of VATIDs to be checked; they are sent normalized like in
+        # validate_fast, since the VIES client only removes spaces and dashes itself
+        # and rejects the whole batch if one number is malformed. Values that only
+        # differ in case or whitespace share one number.
+        by_value = defaultdict(list)
+        for obj in objects:
+            by_value[obj.value.translate(_NORMALIZE_TABLE)].append(obj)
+        vat_ids = list(by_value)
+
+        if len(vat_ids) == 1:
+            # the batch API refuses fewer than 2 numbers, so a single one is
+            # checked on its own
+            vies = viesapi.get_vies_data(vat_ids[0])
+            if not vies:
+                logging.error(
+                    f"Error: {viesapi.get_last_error()} (code: {viesapi.get_last_error_code()})"
+                )
+                return None
+            numbers = [vies]
+        else:
+            numbers = self._get_vies_data_batch(viesapi, vat_ids)
+            if not numbers:
+                return None
+
+        # Update the objects with the batch result
+        now = datetime.now()
+        validated = set()
+        for number in numbers:
+            viesdata = vars(number)
+            country_code = viesdata["country_code"]
+            vat_id = viesdata["vat_number"]
+
+            if viesdata["valid"] is False:
+                additional_information = ""
+                status = "check"
+                status_message = "Invalid VAT ID (API check)"
+            else:
+                trader_info = {
+                    key: viesdata[key] for key in _TRADER_KEYS if key in viesdata
+                }
+                additional_information = json.dumps(trader_info, indent=4, default=str)
+                status = "ok"
+                status_message = ""
+
+            for obj in by_value.get(f"{country_code}{vat_id}", ()):
+                validated.add(obj.value)
+                obj.last_visited = now
+                obj.additional_information = additional_information
+                obj.status = status
+                obj.status_message = status_message
+
+        # remove objects that have not been validated
+        validate_objects = [obj for obj in objects if obj.value in validated]
+
+        return validate_objects
+
+    def _get_vies_data_batch(self, viesapi: VIESAPIClient, vat_ids: List[str]):
+        """
+        Checks 2 to 99 VAT IDs with one VIES batch request and waits for its result.
 
+        Args:
+            viesapi (VIESAPIClient): The client to send the batch with.
+            vat_ids (List[str]): The normalized VAT IDs to be checked.
+
+        Returns:
+            list: The VIES data of the checked numbers, or None if the batch failed.
+        """
         # call bulk check
         token = viesapi.get_vies_data_async(vat_ids)
 
-        # wait for the batch to be processed
+        # wait for the batch to be processed, polling quickly at first and then
+        # less and less often, until the configured timeout has passed
+        delay = _POLL_DELAY
+        deadline = time.monotonic() + self._poll_timeout
         while True:
             result = viesapi.get_vies_data_async_result(token)
             if result:
@@ -103,52 +304,28 @@ class validate_VAT_ID:
                 )
                 return None
 
-            # Batch is still processing, wait for 30 seconds
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                logging.error(
+                    f"Batch result not ready after {self._poll_timeout:g} seconds."
+                )
+                return None
+
             logging.info("Batch is still processing, waiting...")
-            time.sleep(1)
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 1.5, _POLL_MAX_DELAY)
 
         # Process the batch result
         resultvars = vars(result)
-        logging.info(json.dumps(resultvars, indent=4, default=str))
+        # the dump holds every number of the batch, so only build it when needed
+        if logging.getLogger().isEnabledFor(logging.INFO):
+            logging.info(json.dumps(resultvars, indent=4, default=str))
         numbers = resultvars["numbers"]
         if not numbers:
             logging.info("No numbers found in the batch result.")
             return None
         logging.info(f"Batch result: {len(numbers)} numbers found.")
-
-        # Update the objects with the batch result
-        validated = []
-        for number in numbers:
-            viesdata = vars(number)
-            country_code = viesdata["country_code"]
-            vat_id = viesdata["vat_number"]
-
-            for obj in objects:
-                if obj.value == f"{country_code}{vat_id}":
-                    validated.append(obj.value)
-                    obj.last_visited = datetime.now()
-                    if viesdata["valid"] is False:
-                        obj.additional_information = ""
-                        obj.status = "check"
-                        obj.status_message = "Invalid VAT ID (API check)"
-                    else:
-                        trader_info = {
-                            key: value
-                            for key, value in viesdata.items()
-                            if key.startswith("trader")
-                            or key in ["country_code", "source", "vat_number"]
-                        }
-                        obj.additional_information = json.dumps(
-                            trader_info, indent=4, default=str
-                        )
-                        obj.status = "ok"
-                        obj.status_message = ""
-                    break
-        
-        # remove objects that have not been validated   
-        validate_objects = [obj for obj in objects if obj.value in validated]
-        
-        return validate_objects
+        return numbers
 
     def is_valid_vat_syntax(self, vat_id: str) -> bool:
         """
@@ -160,42 +337,10 @@ class validate_VAT_ID:
         Returns:
             bool: True if the VAT ID has a valid syntax, False otherwise.
         """
-        vat_id = vat_id.strip().upper()
-
-        regex = re.compile(
-            r"^("
-            r"ATU\d{8}|"
-            r"BE0\d{9}|"
-            r"BG\d{9,10}|"
-            r"CY\d{8}[A-Z]|"
-            r"CZ\d{8,10}|"
-            r"DE\d{9}|"
-            r"DK\d{8}|"
-            r"EE\d{9}|"
-            r"EL\d{9}|"
-            r"ES[A-Z0-9]\d{7}[A-Z0-9]|"
-            r"FI\d{8}|"
-            r"FR[A-Z0-9]{2}\d{9}|"
-            r"HR\d{11}|"
-            r"HU\d{8}|"
-            r"IE\d{7}[A-W]|"
-            r"IE\d{7}[A-W][A-I]|"
-            r"IT\d{11}|"
-            r"LT(\d{9}|\d{12})|"
-            r"LU\d{8}|"
-            r"LV\d{11}|"
-            r"MT\d{8}|"
-            r"NL\d{9}B\d{2}|"
-            r"PL\d{10}|"
-            r"PT\d{9}|"
-            r"RO\d{2,10}|"
-            r"SE\d{12}|"
-            r"SI\d{8}|"
-            r"SK\d{10}"
-            r")$"
-        )
-
-        return regex.match(vat_id) is not None
+        vat_id = vat_id.translate(_NORMALIZE_TABLE)
+        pattern = _VAT_PATTERNS.get(vat_id[:2])
+        # the number part is matched in place, without slicing it off first
+        return pattern is not None and pattern.match(vat_id, 2) is not None
 
     def is_valid_vat_checksum(self, vat_id: str) -> bool:
         """
@@ -207,29 +352,17 @@ class validate_VAT_ID:
         Returns:
             bool: True if the VAT ID has a valid checksum, False otherwise.
         """
-        country_code = vat_id[:2].upper()
-        number = vat_id[2:]
-
-        country_code = country_code.upper()
-        if country_code == "DE":
-            return self._is_valid_german_vat_checksum(number)
-        elif country_code == "AT":
-            return self._is_valid_austrian_vat_checksum(number)
-        elif country_code == "CH":
-            return self._is_valid_swiss_vat_checksum(number)
-        elif country_code == "IT":
-            return self._is_valid_italian_vat_checksum(number)
-        elif country_code == "NL":
-            return self._is_valid_dutch_vat_checksum(number)
-        elif country_code == "BE":
-            return self._is_valid_belgian_vat_checksum(number)
-        elif country_code == "SE":
-            return self._is_valid_swedish_vat_checksum(number)
-        else:
+        # normalized like in is_valid_vat_syntax, so the country code and the
+        # number are taken from the same upper-cased string
+        vat_id = vat_id.translate(_NORMALIZE_TABLE)
+        checksum = self._CHECKSUMS.get(vat_id[:2])
+        if checksum is None:
             # Default to true for countries without official checksum validation
             return True
+        return checksum(vat_id[2:])
 
-    def _is_valid_german_vat_checksum(self, number: str) -> bool:
+    @staticmethod
+    def _is_valid_german_vat_checksum(number: str) -> bool:
         """
         Validates the checksum for a German VAT ID.
 
@@ -239,22 +372,21 @@ class validate_VAT_ID:
         Returns:
             bool: True if the checksum is valid, False otherwise.
         """
-        if len(number) != 9 or not number.isdigit():
+        if len(number) != 9 or not number.isascii() or not number.isdigit():
             return False
 
+        digits = number.encode("ascii")
         product = 10
-        for i in range(8):
-            sum_ = (int(number[i]) + product) % 10
-            if sum_ == 0:
-                sum_ = 10
-            product = (2 * sum_) % 11
+        for code in digits[:8]:
+            product = _DE_CHECKSUM_STEP[product][code]
 
         check = 11 - product
         if check == 10:
             check = 0
-        return check == int(number[8])
+        return check == digits[8] - 48
 
-    def _is_valid_austrian_vat_checksum(self, number: str) -> bool:
+    @staticmethod
+    def _is_valid_austrian_vat_checksum(number: str) -> bool:
         """
         Validates the checksum for an Austrian VAT ID.
 
@@ -264,22 +396,30 @@ class validate_VAT_ID:
         Returns:
             bool: True if the checksum is valid, False otherwise.
         """
-        if len(number) != 9 or not number.startswith("U"):
+        if (
+            len(number) != 9
+            or not number.startswith("U")
+            or not number.isascii()
+            or not number[1:].isdigit()
+        ):
             return False
 
-        digits = [int(d) for d in number[1:8]]
-        checksum = int(number[8])
-        weights = [1, 2, 1, 2, 1, 2, 1]
-        total = 0
-
-        for i in range(7):
-            product = digits[i] * weights[i]
-            total += product if product < 10 else (product // 10 + product % 10)
+        n = number
+        total = (
+            (ord(n[1]) - 48)
+            + _DOUBLED_DIGIT_SUM[ord(n[2]) - 48]
+            + (ord(n[3]) - 48)
+            + _DOUBLED_DIGIT_SUM[ord(n[4]) - 48]
+            + (ord(n[5]) - 48)
+            + _DOUBLED_DIGIT_SUM[ord(n[6]) - 48]
+            + (ord(n[7]) - 48)
+        )
 
         checkdigit = (10 - (total + 4) % 10) % 10
-        return checkdigit == checksum
+        return checkdigit == ord(n[8]) - 48
 
-    def _is_valid_swiss_vat_checksum(self, number: str) -> bool:
+    @staticmethod
+    def _is_valid_swiss_vat_checksum(number: str) -> bool:
         """
         Validates the checksum for a Swiss VAT ID.
 
@@ -289,67 +429,106 @@ class validate_VAT_ID:
         Returns:
             bool: True if the checksum is valid, False otherwise.
         """
-        if len(number) != 9 or not number.isdigit():
+        if len(number) != 9 or not number.isascii() or not number.isdigit():
             return False
 
-        weights = [5, 4, 3, 2, 7, 6, 5, 4]
-        total = sum(int(number[i]) * weights[i] for i in range(8))
+        # weights 5, 4, 3, 2, 7, 6, 5, 4
+        n = number
+        total = (
+            (ord(n[0]) - 48) * 5
+            + (ord(n[1]) - 48) * 4
+            + (ord(n[2]) - 48) * 3
+            + (ord(n[3]) - 48) * 2
+            + (ord(n[4]) - 48) * 7
+            + (ord(n[5]) - 48) * 6
+            + (ord(n[6]) - 48) * 5
+            + (ord(n[7]) - 48) * 4
+        )
         remainder = total % 11
         check = 11 - remainder
         if check == 10:
             return False
         elif check == 11:
             check = 0
-        return check == int(number[8])
+        return check == ord(n[8]) - 48
 
-    def _is_valid_belgian_vat_checksum(self,number: str) -> bool:
+    @staticmethod
+    def _is_valid_belgian_vat_checksum(number: str) -> bool:
+        """
+        Validates the checksum for a Belgian VAT ID.
+
+        Only the current 10-digit form (a leading 0 followed by nine digits) is
+        accepted, matching the syntax check. Its first eight digits form the base
+        and the last two the check number; the old nine-digit form is not handled.
+
+        Args:
+            number (str): The VAT ID number part (without country code).
+
+        Returns:
+            bool: True if the checksum is valid, False otherwise.
+        """
         if len(number) != 10 or not number.startswith("0") or not number.isdigit():
             return False
 
-        base = int(number[1:9])
-        checksum = int(number[8:10])
-        calculated = 97 - (base % 97)
-        return calculated == checksum
+        return 97 - int(number[:8]) % 97 == int(number[8:])
     
     
-    def _is_valid_italian_vat_checksum(self,number: str) -> bool:
-        if len(number) != 11 or not number.isdigit():
+    @staticmethod
+    def _is_valid_italian_vat_checksum(number: str) -> bool:
+        if len(number) != 11 or not number.isascii() or not number.isdigit():
             return False
 
-        s = 0
-        for i in range(10):
-            n = int(number[i])
-            if i % 2 == 0:
-                s += n
-            else:
-                n = 2 * n
-                s += n if n < 10 else n - 9
+        # digits at odd positions are doubled, Luhn-style
+        encoded = number.encode("ascii")
+        s = sum(encoded[0:10:2].translate(_DIGIT_VALUES)) + sum(
+            encoded[1:10:2].translate(_DOUBLED_DIGIT_VALUES)
+        )
         checkdigit = (10 - (s % 10)) % 10
-        return checkdigit == int(number[10])    
+        return checkdigit == encoded[10] - 48
     
-    def _is_valid_dutch_vat_checksum(self,number: str) -> bool:
+    @staticmethod
+    def _is_valid_dutch_vat_checksum(number: str) -> bool:
         if not number.endswith("B01") and not number.endswith("B02"):
             return True  # Only check for standard formats
 
         digits = number[:9]
-        if not digits.isdigit():
+        if not digits.isascii() or not digits.isdigit():
             return False
 
-        weights = list(range(9, 0, -1))
-        total = sum(int(d) * w for d, w in zip(digits, weights))
-        return total % 11 == 0    
+        values = digits.encode("ascii").translate(_DIGIT_VALUES)
+        total = sum(d * w for d, w in zip(values, range(9, 0, -1)))
+        return total % 11 == 0
     
-    def _is_valid_swedish_vat_checksum(self,number: str) -> bool:
-        if len(number) != 12 or not number.isdigit():
+    @staticmethod
+    def _is_valid_swedish_vat_checksum(number: str) -> bool:
+        if len(number) != 12 or not number.isascii() or not number.isdigit():
             return False
 
-        digits = number[:10]
-        total = 0
-        for i, digit in enumerate(digits):
-            n = int(digit)
-            if i % 2 == 0:
-                n *= 2
-            total += n if n < 10 else (n // 10 + n % 10)
+        # digits at even positions are doubled, Luhn-style
+        encoded = number.encode("ascii")
+        total = sum(encoded[0:10:2].translate(_DOUBLED_DIGIT_VALUES)) + sum(
+            encoded[1:10:2].translate(_DIGIT_VALUES)
+        )
 
         checkdigit = (10 - (total % 10)) % 10
-        return checkdigit == int(number[10])    
\ No newline at end of file
+        return checkdigit == encoded[10] - 48
+
+    # checksum validators by country code, used by is_valid_vat_checksum; as static
+    # methods they are called with the number alone, without binding them first
+    _CHECKSUMS = {
+        "DE": _is_valid_german_vat_checksum,
+        "AT": _is_valid_austrian_vat_checksum,
+        "CH": _is_valid_swiss_vat_checksum,
+        "IT": _is_valid_italian_vat_checksum,
+        "NL": _is_valid_dutch_vat_checksum,
+        "BE": _is_valid_belgian_vat_checksum,
+        "SE": _is_valid_swedish_vat_checksum,
+    }
+
+
+# syntax pattern and checksum validator (None if there is none) by country code,
+# used by validate_fast
+_COUNTRY_DISPATCH = {
+    country_code: (pattern, validate_VAT_ID._CHECKSUMS.get(country_code))
+    for country_code, pattern in _VAT_PATTERNS.items()
+}